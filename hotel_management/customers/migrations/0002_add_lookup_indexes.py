@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-16 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customer',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100, verbose_name='姓名'),
+        ),
+    ]
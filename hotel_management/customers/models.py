@@ -30,7 +30,7 @@ def validate_id_number(value):
 
 class Customer(models.Model):
     """客户模型"""
-    name = models.CharField(max_length=100, verbose_name='姓名')
+    name = models.CharField(max_length=100, db_index=True, verbose_name='姓名')
     id_number = models.CharField(
         max_length=18, unique=True, verbose_name='身份证号',
         validators=[validate_id_number]
@@ -0,0 +1,31 @@
+"""根据描述中的“预订号:N”回填收入/支出记录的关联预订"""
+
+import re
+
+from django.db import migrations
+
+
+RESERVATION_NO = re.compile(r'预订号:(\d+)')
+
+
+def backfill(apps, schema_editor):
+    Reservation = apps.get_model('reservations', 'Reservation')
+    existing = set(Reservation.objects.values_list('id', flat=True))
+    for model_name, filters in (('Income', {'source': 'Room'}), ('Expense', {'category': 'Other'})):
+        model = apps.get_model('finance', model_name)
+        rows = model.objects.filter(reservation__isnull=True, description__contains='预订号:', **filters)
+        for obj in rows.only('id', 'description'):
+            match = RESERVATION_NO.search(obj.description)
+            if match and int(match.group(1)) in existing:
+                model.objects.filter(pk=obj.pk).update(reservation_id=int(match.group(1)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_income_expense_reservation'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
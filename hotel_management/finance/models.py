@@ -15,6 +15,7 @@ class Income(models.Model):
     amount = models.PositiveIntegerField(verbose_name='金额', validators=[MinValueValidator(1)])
     source = models.CharField(max_length=50, choices=INCOME_SOURCES, verbose_name='收入来源')
     description = models.TextField(blank=True, verbose_name='描述')
+    reservation = models.ForeignKey('reservations.Reservation', null=True, blank=True, on_delete=models.SET_NULL, verbose_name='关联预订')
 
     def clean(self):
         super().clean()
@@ -40,6 +41,7 @@ class Expense(models.Model):
     amount = models.PositiveIntegerField(verbose_name='金额', validators=[MinValueValidator(1)])
     category = models.CharField(max_length=50, choices=EXPENSE_CATEGORIES, verbose_name='支出类别')
     description = models.TextField(blank=True, verbose_name='描述')
+    reservation = models.ForeignKey('reservations.Reservation', null=True, blank=True, on_delete=models.SET_NULL, verbose_name='关联预订')
 
     def clean(self):
         super().clean()
@@ -5,18 +5,58 @@
 # 导入Django Admin模块和messages消息模块
 from django.contrib import admin, messages
 # 导入format_html函数，用于在Admin列表中安全地渲染HTML内容
-from django.utils.html import format_html
+from django.utils.html import format_html, escape
+# 导入mark_safe函数，用于标记已转义拼接好的HTML片段
+from django.utils.safestring import mark_safe
 # 导入验证错误异常类
 from django.core.exceptions import ValidationError
 # 导入Django表单模块
 from django import forms
-# 导入Q对象，用于构建复杂的数据库查询条件
-from django.db.models import Q
+# 导入Q对象，用于构建复杂的数据库查询条件；Case/When等用于在SQL中直接算出状态颜色和名称
+from django.db.models import Q, F, Case, When, Value, CharField
+# 导入事务模块，保证批量操作的原子性
+from django.db import transaction
+# 导入时区工具，批量更新时手动维护updated_at
+from django.utils import timezone
+# 导入Admin列表页ChangeList类，用于定制列表查询
+from django.contrib.admin.views.main import ChangeList
 # 导入Reservation和Room模型
 from reservations.models import Reservation
 from rooms.models import Room
 
 
+# 状态 → 中文名称 / 颜色 的映射，模块加载时构建一次，列表页每行直接复用
+ROOM_STATUS_MAP = Room.ROOM_STATUS_MAP
+STATUS_MAP = dict(Reservation.STATUS)
+ROOM_STATUS_COLORS = {
+    'Available': '#28a745',
+    'Booked': '#ffc107',
+    'Occupied': '#dc3545',
+    'Maintenance': '#6c757d'
+}
+STATUS_COLORS = {
+    'Booked': '#007bff',
+    'CheckedIn': '#28a745',
+    'CheckedOut': '#6c757d',
+    'Refunded': '#dc3545'
+}
+
+# 列表页HTML片段模板，只对动态值转义，避免每行重复解析静态标记
+PAID_TPL = '<span style="color:#28a745;font-weight:bold;">￥{}</span>'
+REFUND_TPL = '<span style="color:#dc3545;font-weight:bold;">￥{}</span>'
+ROOM_STATUS_TPL = '<span style="color:{};font-weight:bold;">{}</span>'
+STATUS_TPL = '<span style="background:{};color:white;padding:5px 12px;border-radius:4px;">{}</span>'
+
+
+def choice_case(field, mapping, default):
+    """把 值→显示内容 映射转换为 CASE WHEN 表达式，由数据库在查询时直接算出"""
+    return Case(
+        *[When(**{field: key}, then=Value(value)) for key, value in mapping.items()],
+        default=default,
+        output_field=CharField()
+    )
+
+
 # ================================
 # 预订管理表单类定义
 # ================================
@@ -246,6 +286,34 @@ class ReservationAdminForm(forms.ModelForm):
         return cleaned_data
 
 
+# ================================
+# 预订列表页ChangeList
+# ================================
+
+class ReservationChangeList(ChangeList):
+    """
+    预订列表页ChangeList - 只查询列表展示和批量操作用到的列
+
+    不加载 special_requests 等大字段；编辑页不经过此类，仍读取完整记录
+    """
+
+    list_only_fields = (
+        'id', 'customer__name', 'room__room_number', 'room__status',
+        'check_in_date', 'check_out_date', 'nights', 'number_of_guests',
+        'paid_amount', 'refund_amount', 'income_recorded', 'refund_recorded',
+        'status', 'created_at'
+    )
+
+    def get_queryset(self, request, exclude_parameters=None):
+        qs = super().get_queryset(request, exclude_parameters)
+        return qs.only(*self.list_only_fields).annotate(
+            status_color=choice_case('status', STATUS_COLORS, Value('#000')),
+            status_label=choice_case('status', STATUS_MAP, F('status')),
+            room_status_color=choice_case('room__status', ROOM_STATUS_COLORS, Value('#000')),
+            room_status_label=choice_case('room__status', ROOM_STATUS_MAP, F('room__status')),
+        )
+
+
 # ================================
 # 预订Admin配置类
 # ================================
@@ -282,7 +350,11 @@ class ReservationAdmin(admin.ModelAdmin):
 
     list_per_page = 20
 
-    search_fields = ['customer__name', 'room__room_number', 'id']
+    # 列表页一次JOIN取出客户和房间，避免逐行查询
+    list_select_related = ('customer', 'room')
+
+    # 预订号按主键精确匹配，见 get_search_results
+    search_fields = ['customer__name', 'room__room_number']
 
     list_filter = ('status', 'check_in_date', 'room__room_type')
 
@@ -318,6 +390,23 @@ class ReservationAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_changelist(self, request, **kwargs):
+        """
+        使用只查询必要列的ChangeList
+        """
+        return ReservationChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        纯数字搜索词额外按预订号精确匹配（id = q），走主键索引而不是 LIKE '%q%'
+        """
+        base = queryset
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        term = search_term.strip()
+        if term.isascii() and term.isdigit():
+            queryset |= base.filter(pk=int(term))
+        return queryset, may_have_duplicates
+
     def get_actions(self, request):
         """
         重写获取操作列表的方法
@@ -351,11 +440,7 @@ class ReservationAdmin(admin.ModelAdmin):
         自定义已付金额显示方法（用于列表页面）
         """
         if obj.paid_amount > 0:
-
-            return format_html(
-                '<span style="color:#28a745;font-weight:bold;">￥{}</span>',
-                obj.paid_amount
-            )
+            return mark_safe(PAID_TPL.format(escape(obj.paid_amount)))
         return '￥0.00'
     
     paid_amount_display.short_description = '已付金额'
@@ -366,11 +451,7 @@ class ReservationAdmin(admin.ModelAdmin):
         自定义退款金额显示方法（用于列表页面）
         """
         if obj.refund_amount > 0:
-
-            return format_html(
-                '<span style="color:#dc3545;font-weight:bold;">￥{}</span>',
-                obj.refund_amount
-            )
+            return mark_safe(REFUND_TPL.format(escape(obj.refund_amount)))
         return '-'
     
     refund_amount_display.short_description = '退款金额'
@@ -380,18 +461,8 @@ class ReservationAdmin(admin.ModelAdmin):
         """
         自定义房间状态显示方法（用于列表页面）
         """
-        # 定义状态 → 颜色的映射字典
-        colors = {
-            'Available': '#28a745',
-            'Booked': '#ffc107',
-            'Occupied': '#dc3545',
-            'Maintenance': '#6c757d'
-        }
-        return format_html(
-            '<span style="color:{};font-weight:bold;">{}</span>',
-            colors.get(obj.room.status, '#000'),
-            dict(obj.room.ROOM_STATUS).get(obj.room.status, obj.room.status)  # 获取中文名称
-        )
+        # 颜色和中文名称已由 ReservationChangeList 在SQL中算好
+        return mark_safe(ROOM_STATUS_TPL.format(obj.room_status_color, escape(obj.room_status_label)))
     
     get_room_status.short_description = '房间状态'
 
@@ -399,34 +470,29 @@ class ReservationAdmin(admin.ModelAdmin):
         """
         自定义预订状态彩色显示方法（用于列表页面）
         """
-        colors = {
-            'Booked': '#007bff',
-            'CheckedIn': '#28a745',
-            'CheckedOut': '#6c757d',
-            'Refunded': '#dc3545'
-        }
-        return format_html(
-            '<span style="background:{};color:white;padding:5px 12px;border-radius:4px;">{}</span>',
-            colors.get(obj.status, '#000'),
-            dict(obj.STATUS).get(obj.status, obj.status)
-        )
+        return mark_safe(STATUS_TPL.format(obj.status_color, escape(obj.status_label)))
     
     status_colored.short_description = '预订状态'
 
+    def _bulk_transition(self, queryset, from_status, to_status):
+        """
+        批量变更预订状态：先锁涉及的房间，一条UPDATE完成状态变更，再用 sync_rooms_status() 批量同步房间状态
+        """
+        with transaction.atomic():
+            targets = queryset.filter(status=from_status)
+            room_ids = list(targets.order_by().values_list('room_id', flat=True).distinct())
+            # 与 save() 相同，先锁房间再改预订，避免与同一房间的并发保存交错
+            rooms = list(Room.objects.select_for_update().only('status').filter(pk__in=room_ids))
+            updated = targets.update(status=to_status, updated_at=timezone.now())
+            Reservation.sync_rooms_status(rooms)
+        return updated
+
     @admin.action(description='批量办理入住')
     def make_checkin(self, request, queryset):
         """
         批量办理入住的操作方法
         """
-        updated = sum(
-            1 for r in queryset 
-            if r.status == 'Booked' and (
-                setattr(r, 'status', 'CheckedIn'),
-                r.save(),
-                True
-            )[-1]
-        )
-
+        updated = self._bulk_transition(queryset, 'Booked', 'CheckedIn')
         if updated:
             messages.success(request, f'成功办理{updated}个入住')
 
@@ -435,15 +501,7 @@ class ReservationAdmin(admin.ModelAdmin):
         """
         批量办理离店的操作方法
         """
-
-        updated = sum(
-            1 for r in queryset 
-            if r.status == 'CheckedIn' and (
-                setattr(r, 'status', 'CheckedOut'),
-                r.save(),
-                True
-            )[-1]
-        )
+        updated = self._bulk_transition(queryset, 'CheckedIn', 'CheckedOut')
         if updated:
             messages.success(request, f'成功办理{updated}个离店')
 
@@ -461,18 +519,18 @@ class ReservationAdmin(admin.ModelAdmin):
             )
             return
 
-        updated = 0
-        total = 0
-        
-        # 只处理已预定状态的订单
-        for r in queryset.filter(status='Booked'):
-            r.status = 'Refunded'
-            r.save()
-            updated += 1
+        with transaction.atomic():
+            # 只处理已预定状态的订单：先锁房间再锁预订，一条UPDATE改为已退订，再批量退款
+            rows = Reservation.lock_rows(queryset.filter(status='Booked').with_related())
+            Reservation.objects.filter(pk__in=[r.pk for r in rows]).update(
+                status='Refunded', updated_at=timezone.now()
+            )
+            total = Reservation.bulk_refund(rows)
 
-            r.refresh_from_db()
+            # 涉及的房间一次分组查询同步状态
+            Reservation.sync_rooms_status({r.room_id: r.room for r in rows}.values())
 
-            total += r.refund_amount if r.refund_recorded else 0
+        updated = len(rows)
 
         if updated:
             messages.success(request, f'成功退订{updated}个，总退款:￥{total}')
@@ -493,14 +551,14 @@ class ReservationAdmin(admin.ModelAdmin):
             return
 
         count = 0
-        total = 0
-        
-        for obj in queryset:
-
-            if obj.status == 'Refunded' and obj.paid_amount > 0 and not obj.refund_recorded:
-                total += obj.paid_amount
-            obj.delete()
-            count += 1
+        with transaction.atomic():
+            # 尚未退款的已退订订单先批量补退款，逐条删除时不再单独退款
+            total = Reservation.bulk_refund(
+                queryset.filter(status='Refunded').with_related()
+            )
+            for obj in queryset:
+                obj.delete()
+                count += 1
 
         msg = f'已成功删除 {count} 个预订'
         if total > 0:
@@ -513,7 +571,9 @@ class ReservationAdmin(admin.ModelAdmin):
         重写模型保存方法
         """
         try:
-            obj.save()
+            # 编辑时房间和日期都没变，不会产生新的时段冲突，跳过冲突查询
+            unchanged = change and not {'room', 'check_in_date', 'check_out_date'} & set(form.changed_data)
+            obj.save(skip_conflict_check=unchanged, validate=False)
 
             if not change and obj.paid_amount > 0:
                 messages.info(request, f'已付金额:￥{obj.paid_amount}')
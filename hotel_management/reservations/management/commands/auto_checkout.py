@@ -0,0 +1,12 @@
+"""批量办理逾期离店 - 建议每日定时执行：python manage.py auto_checkout"""
+from django.core.management.base import BaseCommand
+
+from reservations.models import Reservation
+
+
+class Command(BaseCommand):
+    help = '将已过离店日期仍为已入住的预订改为已离店，并同步房间状态'
+
+    def handle(self, *args, **options):
+        count = Reservation.auto_checkout_overdue()
+        self.stdout.write(self.style.SUCCESS(f'已自动办理离店 {count} 个预订'))
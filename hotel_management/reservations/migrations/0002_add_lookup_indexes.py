@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-16 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_add_lookup_indexes'),
+        ('reservations', '0001_initial'),
+        ('rooms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservation',
+            name='status',
+            field=models.CharField(choices=[('Booked', '已预订'), ('CheckedIn', '已入住'), ('CheckedOut', '已离店'), ('Refunded', '已退订')], default='Booked', max_length=20, verbose_name='预订状态'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['room', 'status', 'check_in_date', 'check_out_date'], name='res_conflict_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'check_in_date'], name='res_status_checkin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['-check_in_date'], name='res_checkin_desc_idx'),
+        ),
+    ]
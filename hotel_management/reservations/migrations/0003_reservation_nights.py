@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-16 02:10
+
+from django.db import migrations, models
+
+
+def backfill_nights(apps, schema_editor):
+    Reservation = apps.get_model('reservations', 'Reservation')
+    rows = list(Reservation.objects.only('id', 'check_in_date', 'check_out_date'))
+    for r in rows:
+        r.nights = max((r.check_out_date - r.check_in_date).days, 0)
+    Reservation.objects.bulk_update(rows, ['nights'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0002_add_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='nights',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='离店日期-入住日期，保存时自动计算', verbose_name='入住天数'),
+        ),
+        migrations.RunPython(backfill_nights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-16 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_reservation_nights'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'check_out_date'], name='res_status_checkout_idx'),
+        ),
+    ]
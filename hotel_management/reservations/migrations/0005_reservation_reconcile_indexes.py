@@ -0,0 +1,21 @@
+# Generated by Django 5.0.14 on 2026-10-16 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0004_reservation_checkout_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['income_recorded', 'paid_amount'], name='resv_income_unrec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['refund_recorded', 'status'], name='resv_refund_unrec_idx'),
+        ),
+    ]
@@ -1,12 +1,30 @@
 """预订管理模块 - 数据模型"""
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.db.models import Q, F, Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from functools import partial
 from decimal import Decimal
 from customers.models import Customer
 from rooms.models import Room
+from finance.models import Income, Expense
+
+
+class ReservationQuerySet(models.QuerySet):
+    """预订查询集"""
+
+    def with_related(self):
+        """一并JOIN取出客户和房间"""
+        return self.select_related('customer', 'room')
+
+
+class ReservationManager(models.Manager.from_queryset(ReservationQuerySet)):
+    """预订默认管理器 - 预订几乎总要用到客户和房间，查询时一并JOIN取出"""
+
+    def get_queryset(self):
+        return super().get_queryset().with_related()
 
 
 class Reservation(models.Model):
@@ -22,6 +40,7 @@ class Reservation(models.Model):
     room = models.ForeignKey(Room, on_delete=models.CASCADE, verbose_name='房间')
     check_in_date = models.DateField(verbose_name='入住日期')
     check_out_date = models.DateField(verbose_name='离店日期')
+    nights = models.PositiveIntegerField(default=0, editable=False, verbose_name='入住天数', help_text='离店日期-入住日期，保存时自动计算')
     number_of_guests = models.PositiveIntegerField(verbose_name='入住人数', validators=[MinValueValidator(1), MaxValueValidator(100)])
     special_requests = models.TextField(blank=True, verbose_name='特殊要求')
     status = models.CharField(max_length=20, choices=STATUS, default='Booked', verbose_name='预订状态')
@@ -32,107 +51,411 @@ class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
 
+    objects = ReservationManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """从数据库加载时记录原状态和原房间，save() 据此判断变化，无需再查一次"""
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_state()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        # 访问延迟加载的字段时也会走这里（fields 只含该字段），只更新真正重新读取的原值，
+        # 否则内存中尚未保存的状态修改会被误记为原状态
+        if fields is None:
+            self._remember_loaded_state()
+            return
+        fields = set(fields)
+        if 'status' in fields:
+            self._loaded_status = self.__dict__.get('status')
+        if fields & {'room', 'room_id'}:
+            self._loaded_room_id = self.__dict__.get('room_id')
+
+    def _remember_loaded_state(self):
+        # 只读取已加载的字段，避免对延迟加载的字段触发额外查询
+        self._loaded_status = self.__dict__.get('status')
+        self._loaded_room_id = self.__dict__.get('room_id')
+
     def clean(self):
         super().clean()
         if self.check_in_date and self.check_out_date:
             if self.check_in_date >= self.check_out_date:
                 raise ValidationError('入住日期必须早于离店日期')
-            if self.room_id:
-                days = (self.check_out_date - self.check_in_date).days
-                self.paid_amount = Decimal(str(days)) * self.room.price
+        self._compute_amounts()
         if self.room_id and self.number_of_guests:
-            if self.number_of_guests > self.room.capacity:
-                raise ValidationError(f'入住人数({self.number_of_guests})超过房间容量({self.room.capacity})')
-        if self.room_id and self.check_in_date and self.check_out_date:
-            conflict = Reservation.objects.filter(room=self.room, status__in=['Booked', 'CheckedIn']).filter(
-                Q(check_in_date__lt=self.check_out_date) & Q(check_out_date__gt=self.check_in_date)
-            )
-            if self.pk:
-                conflict = conflict.exclude(pk=self.pk)
-            if conflict.exists():
-                raise ValidationError(f'房间{self.room.room_number}该时段已被预订')
-
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        from datetime import date
-        if self.check_out_date and self.check_out_date < date.today():
-            if self.status == 'CheckedIn':
-                self.status = 'CheckedOut'
-        is_new = self.pk is None
-        old_status = None
-        if not is_new:
+            room = self._cached_room()
+            if self.number_of_guests > room.capacity:
+                raise ValidationError(f'入住人数({self.number_of_guests})超过房间容量({room.capacity})')
+        if not getattr(self, '_skip_conflict_check', False):
+            self._check_conflict()
+
+    def _compute_amounts(self):
+        """根据日期和房价计算入住天数和应付金额"""
+        if self.check_in_date and self.check_out_date:
+            self.nights = (self.check_out_date - self.check_in_date).days
+            if self.room_id:
+                # 房价为整数，直接整数相乘后转为Decimal，无需经字符串构造
+                self.paid_amount = Decimal(self._cached_room().price * self.nights)
+
+    def _check_conflict(self):
+        """检查同一房间的时段冲突"""
+        if not (self.room_id and self.check_in_date and self.check_out_date):
+            return
+        # 条件与 res_conflict_idx 索引列顺序一致；exists() 生成 SELECT 1 ... LIMIT 1，命中即返回
+        conflict = Reservation.objects.filter(
+            room_id=self.room_id, status__in=['Booked', 'CheckedIn'],
+            check_in_date__lt=self.check_out_date, check_out_date__gt=self.check_in_date
+        )
+        if self.pk:
+            conflict = conflict.exclude(pk=self.pk)
+        if conflict.exists():
+            raise ValidationError(f'房间{self._cached_room().room_number}该时段已被预订')
+
+    # 校验、计算金额和生成描述用到的房间字段，其余列（设施、描述、图片）不必读取
+    ROOM_FIELDS = ('price', 'capacity', 'room_number', 'status')
+
+    def _cached_room(self):
+        """校验和描述用的房间：优先用 save() 加锁读到的房间，其次是随预订加载的房间，都没有才只查询需要的列"""
+        room = getattr(self, '_room_cache', None)
+        if room is not None and room.pk == self.room_id:
+            return room
+        if Reservation.room.is_cached(self):
+            return self.room
+        room = Room.objects.only(*self.ROOM_FIELDS).get(pk=self.room_id)
+        self._room_cache = room
+        return room
+
+    # 影响校验、金额或房间状态的字段；save(update_fields=...) 不含这些字段时直接保存
+    SIDE_EFFECT_FIELDS = frozenset({
+        'room', 'room_id', 'check_in_date', 'check_out_date', 'number_of_guests', 'status',
+        'paid_amount', 'refund_amount', 'income_recorded', 'refund_recorded',
+    })
+
+    # 决定入住天数和应付金额的字段
+    AMOUNT_INPUT_FIELDS = frozenset({'room', 'room_id', 'check_in_date', 'check_out_date'})
+
+    def save(self, *args, skip_conflict_check=False, validate=True, **kwargs):
+        """
+        保存预订
+
+        房间和日期未变化时可传 skip_conflict_check=True 跳过时段冲突查询；
+        调用方已完成校验（如后台表单）时可传 validate=False 跳过 full_clean()，
+        此时仍会重新计算金额，并在房间行锁内复查时段冲突
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.pk is not None and self.SIDE_EFFECT_FIELDS.isdisjoint(update_fields):
+            # 只改特殊要求等字段：不涉及校验、财务记录和房间状态
+            super().save(*args, **kwargs)
+            return
+        # 本次保存用同一个本地日期：自动离店判断和收入/退款记录日期保持一致
+        today = timezone.localdate()
+        with transaction.atomic():
+            room = None
+            if self.room_id:
+                # 锁定房间行，串行化同一房间的并发预订，保证下方冲突检测有效；
+                # 锁定时取到的是最新的房间数据，校验和状态同步都直接复用
+                room = Room.objects.select_for_update().only(*self.ROOM_FIELDS).filter(pk=self.room_id).first()
+                self._room_cache = room
+            if validate:
+                self._skip_conflict_check = skip_conflict_check
+                try:
+                    self.full_clean()
+                finally:
+                    self._skip_conflict_check = False
+            else:
+                # 表单校验时尚未加锁，金额按锁定读取的房价重算，冲突在锁内再查一次
+                self._compute_amounts()
+                if not skip_conflict_check:
+                    self._check_conflict()
+            auto_checked_out = False
+            if self.check_out_date and self.check_out_date < today:
+                if self.status == 'CheckedIn':
+                    self.status = 'CheckedOut'
+                    auto_checked_out = True
+            is_new = self.pk is None
+            # 优先使用加载时记录的原状态，只有手工构造的实例才回查数据库
+            old_status = getattr(self, '_loaded_status', None)
+            old_room_id = getattr(self, '_loaded_room_id', None)
+            if not is_new and old_status is None:
+                old = Reservation.objects.filter(pk=self.pk).values_list('status', 'room_id').first()
+                if old:
+                    old_status, old_room_id = old
+            # 收入/退款标记随本次INSERT/UPDATE一并写入，不再单独补一条UPDATE
+            record_income = self.paid_amount > 0 and not self.income_recorded
+            record_refund = (not is_new and old_status != 'Refunded' and self.status == 'Refunded'
+                             and self.paid_amount > 0 and not self.refund_recorded)
+            # 标记先在实例上置位、随本次保存写入；之后任一步失败事务回滚时恢复原值，
+            # 否则重试保存同一实例会跳过收入/退款记录
+            flags = (self.income_recorded, self.refund_recorded, self.refund_amount)
             try:
-                old_status = Reservation.objects.get(pk=self.pk).status
-            except Reservation.DoesNotExist:
-                pass
-        super().save(*args, **kwargs)
-        self._update_room_status()
-        if self.paid_amount > 0 and not self.income_recorded:
-            self._create_income_record()
-        if not is_new and old_status != 'Refunded' and self.status == 'Refunded':
-            self._process_refund()
-
-    def _update_room_status(self):
-        """同步房间状态"""
-        active = Reservation.objects.filter(room=self.room, status__in=['Booked', 'CheckedIn'])
-        if active.filter(status='CheckedIn').exists():
+                if record_income:
+                    self.income_recorded = True
+                if record_refund:
+                    self.refund_recorded = True
+                    self.refund_amount = self.paid_amount
+                if update_fields is not None:
+                    # 上面重新计算或修改过的列也要写入，否则只改日期/房间时天数和金额不会落库
+                    extra = set()
+                    if not self.AMOUNT_INPUT_FIELDS.isdisjoint(update_fields):
+                        extra |= {'nights', 'paid_amount'}
+                    if auto_checked_out:
+                        extra.add('status')
+                    if record_income or record_refund:
+                        extra |= {'income_recorded', 'refund_recorded', 'refund_amount'}
+                    if extra:
+                        kwargs['update_fields'] = set(update_fields) | extra
+                super().save(*args, **kwargs)
+                # 只有状态或房间变化才会影响房间状态，其余编辑（如特殊要求）无需同步
+                if is_new or old_status != self.status or old_room_id != self.room_id:
+                    self._update_room_status(room)
+                    if old_room_id and old_room_id != self.room_id:
+                        self.sync_room_status(Room.objects.select_for_update().only('status').get(pk=old_room_id))
+                if record_income:
+                    self._create_income_record(today)
+                if record_refund:
+                    self._record_refund(today)
+            except Exception:
+                self.income_recorded, self.refund_recorded, self.refund_amount = flags
+                raise
+            # 锁定读取的房间只在本次保存内有效
+            self._room_cache = None
+            self._remember_loaded_state()
+
+    def _update_room_status(self, room=None):
+        """同步房间状态；未传入房间时加锁读取最新的房间数据"""
+        if room is None:
+            room = Room.objects.select_for_update().only('status').get(pk=self.room_id)
+        self.sync_room_status(room)
+        if Reservation.room.is_cached(self) and self.room is not room:
+            self.room.status = room.status
+
+    @staticmethod
+    def sync_room_status(room):
+        """根据房间的活跃预订重新计算房间状态"""
+        counts = Reservation.objects.filter(room=room, status__in=['Booked', 'CheckedIn']).aggregate(
+            has_in=Count('pk', filter=Q(status='CheckedIn')),
+            has_booked=Count('pk', filter=Q(status='Booked'))
+        )
+        if counts['has_in'] > 0:
             new_status = 'Occupied'
-        elif active.filter(status='Booked').exists():
+        elif counts['has_booked'] > 0:
             new_status = 'Booked'
         else:
-            new_status = 'Available' if self.room.status != 'Maintenance' else 'Maintenance'
-        if self.room.status != new_status:
-            self.room.status = new_status
-            self.room.save()
+            new_status = 'Available' if room.status != 'Maintenance' else 'Maintenance'
+        if room.status != new_status:
+            # 只改状态一列，直接UPDATE，不经过 Room.save()
+            Room.objects.filter(pk=room.pk).update(status=new_status)
+            room.status = new_status
 
-    def _create_income_record(self):
-        """创建收入记录"""
-        from finance.models import Income
-        days = (self.check_out_date - self.check_in_date).days
-        description = (f'预订号:{self.id} | 客户:{self.customer.name} | 房间:{self.room.room_number} | '
-                      f'{self.check_in_date} 至 {self.check_out_date} (共{days}天) | 人数:{self.number_of_guests}')
-        Income.objects.create(date=timezone.now().date(), amount=self.paid_amount, source='Room', description=description)
-        Reservation.objects.filter(pk=self.pk).update(income_recorded=True)
-
-    def _process_refund(self):
-        """处理退款"""
-        if self.refund_recorded or self.paid_amount <= 0:
+    @staticmethod
+    def sync_rooms_status(rooms):
+        """批量同步多个房间的状态：一次分组查询统计活跃预订，每种目标状态一条UPDATE"""
+        rooms = list(rooms)
+        if not rooms:
             return
-        from finance.models import Income, Expense
-        self.refund_amount = self.paid_amount
-        days = (self.check_out_date - self.check_in_date).days
-        description = (f'退款-预订号:{self.id} | 客户:{self.customer.name} | 房间:{self.room.room_number} | '
-                      f'{self.check_in_date} 至 {self.check_out_date}({days}天) | 退款:￥{self.refund_amount}')
-        Expense.objects.create(date=timezone.now().date(), amount=self.refund_amount, category='Other', description=description)
+        counts = {
+            row['room_id']: row for row in Reservation.objects.filter(
+                room__in=rooms, status__in=['Booked', 'CheckedIn']
+            ).order_by().values('room_id').annotate(
+                has_in=Count('pk', filter=Q(status='CheckedIn')),
+                has_booked=Count('pk', filter=Q(status='Booked'))
+            )
+        }
+        changed = {}
+        for room in rooms:
+            row = counts.get(room.pk)
+            if row and row['has_in'] > 0:
+                new_status = 'Occupied'
+            elif row and row['has_booked'] > 0:
+                new_status = 'Booked'
+            else:
+                new_status = 'Available' if room.status != 'Maintenance' else 'Maintenance'
+            if room.status != new_status:
+                changed.setdefault(new_status, []).append(room.pk)
+                room.status = new_status
+        for new_status, ids in changed.items():
+            Room.objects.filter(pk__in=ids).update(status=new_status)
+
+    @classmethod
+    def auto_checkout_overdue(cls):
+        """已过离店日期仍为已入住的预订批量改为已离店，并同步涉及的房间状态，返回处理数量"""
+        with transaction.atomic():
+            overdue = cls.objects.filter(status='CheckedIn', check_out_date__lt=timezone.localdate())
+            room_ids = list(overdue.order_by().values_list('room_id', flat=True).distinct())
+            if not room_ids:
+                return 0
+            # 与 save() 相同，先锁房间再改预订
+            rooms = list(Room.objects.select_for_update().only('status').filter(pk__in=room_ids))
+            count = overdue.update(status='CheckedOut', updated_at=timezone.now())
+            cls.sync_rooms_status(rooms)
+        return count
+
+    @classmethod
+    def bulk_load(cls, reservations, batch_size=1000):
+        """
+        批量导入预订（历史数据迁移等），返回导入数量
+
+        不逐条调用 save()：房间一次查出并加锁，天数和金额在内存中计算，预订分批 bulk_create；
+        收入、退款记录和房间状态在导入后按涉及的房间批量补齐。
+        不做时段冲突检查，由调用方保证导入的数据没有重叠
+        """
+        reservations = list(reservations)
+        if not reservations:
+            return 0
+        with transaction.atomic():
+            rooms = Room.objects.select_for_update().only(*cls.ROOM_FIELDS).in_bulk({r.room_id for r in reservations})
+            # 房间已加锁，这些房间不会再有并发写入；记下导入前的最大主键，用于找回本次导入的预订
+            last_pk = cls.objects.aggregate(m=Max('pk'))['m'] or 0
+            for r in reservations:
+                room = rooms.get(r.room_id)
+                if room is None:
+                    raise ValidationError(f'房间(ID:{r.room_id})不存在')
+                if r.check_in_date >= r.check_out_date:
+                    raise ValidationError(f'房间{room.room_number}：入住日期({r.check_in_date})必须早于离店日期({r.check_out_date})')
+                if r.number_of_guests > room.capacity:
+                    raise ValidationError(f'房间{room.room_number}：入住人数({r.number_of_guests})超过房间容量({room.capacity})')
+                r._room_cache = room
+                r._compute_amounts()
+                r._room_cache = None
+                # 收入和退款标记由下方统一补记
+                r.income_recorded = r.refund_recorded = False
+                r.refund_amount = 0
+            cls.objects.bulk_create(reservations, batch_size=batch_size)
+            # MySQL 的 bulk_create 不回填自增主键：只按主键范围（及调用方指定的主键）找回本次导入的预订，
+            # 同一房间中原有的预订不受影响
+            explicit_pks = [r.pk for r in reservations if r.pk is not None]
+            pending = cls.objects.filter(
+                Q(pk__gt=last_pk) | Q(pk__in=explicit_pks), room_id__in=rooms.keys(), paid_amount__gt=0
+            )
+            cls.record_pending_income(pending.filter(income_recorded=False))
+            cls.bulk_refund(pending.filter(status='Refunded', refund_recorded=False))
+            cls.sync_rooms_status(rooms.values())
+        return len(reservations)
+
+    def _base_desc(self):
+        """收入/退款描述共用的部分：预订号、客户、房间和日期"""
+        return (f'预订号:{self.id} | 客户:{self.customer.name} | 房间:{self._cached_room().room_number} | '
+                f'{self.check_in_date} 至 {self.check_out_date}')
+
+    def _create_income_record(self, today):
+        """创建收入记录"""
+        self._build_income(today).save()
+
+    def _build_income(self, today):
+        """构造（未保存的）收入记录"""
+        description = f'{self._base_desc()} (共{self.nights}天) | 人数:{self.number_of_guests}'
+        return Income(date=today, amount=self.paid_amount, source='Room', description=description, reservation=self)
+
+    def _build_refund_expense(self, today):
+        """构造（未保存的）退款支出记录"""
+        description = f'退款-{self._base_desc()}({self.nights}天) | 退款:{self._format_amount(self.paid_amount)}'
+        return Expense(date=today, amount=self.paid_amount, category='Other', description=description, reservation=self)
+
+    @staticmethod
+    def _append_income_note(reservation_id, note):
+        """在预订关联的收入记录描述末尾追加备注（数据库端拼接，一条UPDATE）"""
+        Income.objects.filter(reservation_id=reservation_id).update(
+            description=Concat('description', Value(note))
+        )
+
+    @staticmethod
+    def _format_amount(amount):
+        """财务描述中的金额统一保留两位小数：内存中算出的整数金额与数据库读出的Decimal写法一致"""
+        return f'￥{Decimal(amount):.2f}'
+
+    @classmethod
+    def _refund_note(cls, amount):
+        """收入记录描述末尾的退订备注"""
+        return f' | [已退订-退款{cls._format_amount(amount)}]'
+
+    def _record_refund(self, today):
+        """写入退款支出并标注收入记录（退款标记由调用方负责写入）"""
+        self._build_refund_expense(today).save()
         if self.income_recorded:
-            income = Income.objects.filter(source='Room', description__contains=f'预订号:{self.id}').first()
-            if income:
-                income.description += f' | [已退订-退款￥{self.refund_amount}]'
-                income.save()
-        Reservation.objects.filter(pk=self.pk).update(refund_recorded=True, refund_amount=self.refund_amount)
+            # 收入备注只是说明文字，等事务提交后再写，缩短房间行锁的持有时间；
+            # 退款支出和退款标记仍在同一事务内，保证账目一致
+            transaction.on_commit(partial(self._append_income_note, self.id, self._refund_note(self.paid_amount)))
+
+    @classmethod
+    def lock_rows(cls, queryset):
+        """
+        加锁读取一批预订（需在事务内调用），返回预订列表
+
+        与 save() 的加锁顺序一致：先锁涉及的房间，再锁预订；
+        预订查询默认JOIN客户和房间，只锁预订行本身，避免顺带锁住客户和房间
+        """
+        room_ids = list(queryset.order_by().values_list('room_id', flat=True).distinct())
+        if not room_ids:
+            return []
+        list(Room.objects.select_for_update().only('status').filter(pk__in=room_ids))
+        return list(queryset.select_for_update(of=('self',)))
+
+    @classmethod
+    def record_pending_income(cls, reservations):
+        """为尚未记录收入的预订（列表或QuerySet）批量补记收入，返回补记金额合计"""
+        with transaction.atomic():
+            if isinstance(reservations, models.QuerySet):
+                reservations = cls.lock_rows(reservations)
+            rows = [r for r in reservations if r.paid_amount > 0 and not r.income_recorded]
+            if not rows:
+                return Decimal('0')
+            today = timezone.localdate()
+            Income.objects.bulk_create([r._build_income(today) for r in rows], batch_size=500)
+            cls.objects.filter(pk__in=[r.pk for r in rows]).update(income_recorded=True)
+        for r in rows:
+            r.income_recorded = True
+        return sum(r.paid_amount for r in rows)
+
+    @classmethod
+    def bulk_refund(cls, reservations):
+        """
+        批量退款（预订列表或QuerySet），返回退款总额
+
+        传入QuerySet时先加锁读取，避免并发重复退款；
+        退款支出一次 bulk_create，退款标记一次 UPDATE，收入记录一次 UPDATE，
+        查询次数与预订数量无关
+        """
+        with transaction.atomic():
+            if isinstance(reservations, models.QuerySet):
+                reservations = cls.lock_rows(reservations)
+            rows = [r for r in reservations if r.paid_amount > 0 and not r.refund_recorded]
+            if not rows:
+                return Decimal('0')
+            today = timezone.localdate()
+            Expense.objects.bulk_create([r._build_refund_expense(today) for r in rows], batch_size=500)
+            cls.objects.filter(pk__in=[r.pk for r in rows]).update(refund_recorded=True, refund_amount=F('paid_amount'))
+            income_ids = [r.pk for r in rows if r.income_recorded]
+            if income_ids:
+                # 各条备注的金额不同，用关联子查询取各自预订的已付金额，一条UPDATE写完；
+                # MySQL 中 decimal(10,2) 转字符串保留两位小数，与 _format_amount() 一致
+                amount = Subquery(cls.objects.filter(pk=OuterRef('reservation_id')).values('paid_amount')[:1])
+                Income.objects.filter(reservation_id__in=income_ids).update(description=Concat(
+                    'description', Value(' | [已退订-退款￥'), Cast(amount, models.CharField()), Value(']')
+                ))
+        for r in rows:
+            r.refund_recorded = True
+            r.refund_amount = r.paid_amount
+        return sum(r.paid_amount for r in rows)
 
     def delete(self, *args, **kwargs):
         """删除预订并处理退款"""
         room = self.room
-        if self.paid_amount > 0 and not self.refund_recorded and self.status == 'Refunded':
-            self._process_refund()
-        if self.income_recorded:
-            from finance.models import Income
-            income = Income.objects.filter(source='Room', description__contains=f'预订号:{self.id}').first()
-            if income:
-                income.description += ' | [预订已删除]'
-                income.save()
-        super().delete(*args, **kwargs)
-        active = Reservation.objects.filter(room=room, status__in=['Booked', 'CheckedIn'])
-        if active.filter(status='CheckedIn').exists():
-            new_status = 'Occupied'
-        elif active.filter(status='Booked').exists():
-            new_status = 'Booked'
-        else:
-            new_status = 'Available' if room.status != 'Maintenance' else 'Maintenance'
-        if room.status != new_status:
-            room.status = new_status
-            room.save()
+        with transaction.atomic():
+            note = ''
+            if self.paid_amount > 0 and not self.refund_recorded and self.status == 'Refunded':
+                # 预订随即删除，只写退款支出，不必再回写退款标记
+                self.refund_amount = self.paid_amount
+                self.refund_recorded = True
+                self._build_refund_expense(timezone.localdate()).save()
+                note = self._refund_note(self.paid_amount)
+            if self.income_recorded:
+                # 必须在删除前写入：删除预订后收入记录的关联会被置空
+                self._append_income_note(self.id, note + ' | [预订已删除]')
+            result = super().delete(*args, **kwargs)
+            self.sync_room_status(room)
+        return result
 
     def __str__(self):
         return f"预订号:{self.id}-{self.customer.name}-{self.room.room_number}"
@@ -141,3 +464,12 @@ class Reservation(models.Model):
         verbose_name = '预订'
         verbose_name_plural = '预订'
         ordering = ['-check_in_date']
+        indexes = [
+            models.Index(fields=['room', 'status', 'check_in_date', 'check_out_date'], name='res_conflict_idx'),
+            models.Index(fields=['status', 'check_in_date'], name='res_status_checkin_idx'),
+            models.Index(fields=['-check_in_date'], name='res_checkin_desc_idx'),
+            models.Index(fields=['status', 'check_out_date'], name='res_status_checkout_idx'),
+            # 对账时查找未记录收入/未退款的预订（MySQL不支持部分索引，用普通组合索引）
+            models.Index(fields=['income_recorded', 'paid_amount'], name='resv_income_unrec_idx'),
+            models.Index(fields=['refund_recorded', 'status'], name='resv_refund_unrec_idx'),
+        ]
@@ -1,27 +1,88 @@
 """房间管理Admin配置模块"""
 from django.contrib import admin
-from django.utils.html import format_html
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django import forms
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Left
+from django.contrib.admin.views.main import ChangeList
 from rooms.models import Room
 
+# 占用房间的预订状态
+ACTIVE_STATUSES = ['Booked', 'CheckedIn']
+
+# 存在活跃订单时不允许修改的字段；设施、描述、图片等说明性字段仍可编辑
+GUARDED_FIELDS = {'room_number', 'room_type', 'price', 'capacity', 'floor', 'status'}
+
+# 列表页设施、描述列只显示前若干个字符
+LIST_TEXT_LENGTH = 20
+
+# 房间状态 → 颜色 的映射，模块加载时构建一次，列表页每行直接复用
+ROOM_STATUS_COLORS = {
+    'Available': '#28a745',
+    'Booked': '#ffc107',
+    'Occupied': '#dc3545',
+    'Maintenance': '#6c757d'
+}
+
+# 列表页HTML片段模板，只对动态值转义，避免每行重复解析静态标记
+PRICE_TPL = '<span style="color:#28a745;font-weight:bold;font-size:14px;">￥{}</span>'
+ROOM_STATUS_TPL = '<span style="background:{};color:white;padding:3px 10px;border-radius:3px;font-weight:bold;">{}</span>'
+PICTURE_TPL = '<a href="{0}" data-lightbox="room-{1}"><img src="{0}" width="100" height="100"/></a>'
+
+# 列表页图片预览使用的lightbox资源
+LIGHTBOX_MEDIA = forms.Media(
+    js=('https://cdn.jsdelivr.net/npm/lightbox2@2.11.3/dist/js/lightbox.min.js',),
+    css={'all': ('https://cdn.jsdelivr.net/npm/lightbox2@2.11.3/dist/css/lightbox.min.css',)},
+)
+
+
+def active_reservations():
+    """关联到外层房间的活跃订单子查询"""
+    from reservations.models import Reservation
+    return Reservation.objects.filter(room=OuterRef('pk'), status__in=ACTIVE_STATUSES).order_by()
+
+
+def active_reservation_count(room):
+    """房间的活跃订单数：经Admin查询集读取的房间已带 active_count 注解，否则单独统计"""
+    count = getattr(room, 'active_count', None)
+    if count is None:
+        from reservations.models import Reservation
+        count = Reservation.objects.filter(room=room, status__in=ACTIVE_STATUSES).count()
+    return count
+
+
 class RoomAdminForm(forms.ModelForm):
-    """房间管理表单类 - 验证有活跃订单的房间不允许修改"""
+    """房间管理表单类 - 验证有活跃订单的房间不允许修改关键信息"""
     class Meta:
         model = Room
         fields = '__all__'
 
     def clean(self):
         cleaned_data = super().clean()
-        if self.instance.pk:
-            from reservations.models import Reservation
-            active = Reservation.objects.filter(room=self.instance, status__in=['Booked', 'CheckedIn'])
-            if active.exists():
-                raise ValidationError(f'该房间存在{active.count()}个活跃订单，无法修改房间信息！')
+        # 只改了说明性字段时不必检查活跃订单
+        if self.instance.pk and GUARDED_FIELDS & set(self.changed_data):
+            active = active_reservation_count(self.instance)
+            if active:
+                raise ValidationError(f'该房间存在{active}个活跃订单，无法修改房间信息！')
         return cleaned_data
 
 
+class RoomChangeList(ChangeList):
+    """房间列表页ChangeList - 设施、描述只在SQL中截取前几个字符，不加载整段文本；编辑页仍读取完整记录"""
+
+    list_only_fields = ('id', 'room_number', 'room_type', 'price', 'status', 'pictures', 'floor', 'capacity')
+
+    def get_queryset(self, request, exclude_parameters=None):
+        qs = super().get_queryset(request, exclude_parameters)
+        return qs.only(*self.list_only_fields).annotate(
+            facilities_head=Left('facilities', LIST_TEXT_LENGTH + 1),
+            description_head=Left('description', LIST_TEXT_LENGTH + 1),
+        )
+
+
 admin.site.site_header = '酒店入住管理系统'
 admin.site.site_title = '酒店入住管理系统后台'
 admin.site.index_title = '欢迎来到酒店入住管理系统后台'
@@ -30,17 +91,28 @@ admin.site.index_title = '欢迎来到酒店入住管理系统后台'
 class RoomAdmin(admin.ModelAdmin):
     """房间Admin配置类"""
     form = RoomAdminForm
-    list_display = ('room_number', 'room_type', 'price_display', 'status_colored', 'picture_image', 'facilities', 'floor', 'capacity', 'description')
+    list_display = ('room_number', 'room_type', 'price_display', 'status_colored', 'picture_image', 'facilities_short', 'floor', 'capacity', 'description_short')
     ordering = ('-price',)
     list_display_links = ('room_number',)
     list_per_page = 20
-    search_fields = ['room_number', 'room_type']
+    # 房间号按前缀匹配（LIKE 'xx%' 可以使用唯一索引）
+    search_fields = ['^room_number', 'room_type']
     actions = ['safe_delete_selected']
     fieldsets = (
         (None, {'fields': ('room_number', 'room_type', 'price', 'pictures')}),
         ('详细信息', {'fields': ('facilities', 'status', 'floor', 'capacity', 'description')})
     )
 
+    def get_queryset(self, request):
+        """房间查询时一并统计活跃订单数，编辑校验和删除检查直接使用，无需再逐个查询"""
+        # 用相关子查询统计，外层查询不需要 JOIN + GROUP BY，后续过滤、删除都保持简单
+        counts = active_reservations().values('room').annotate(n=Count('pk')).values('n')
+        return super().get_queryset(request).annotate(active_count=Coalesce(Subquery(counts), 0))
+
+    def get_changelist(self, request, **kwargs):
+        """列表页只查询展示用到的列"""
+        return RoomChangeList
+
     def get_actions(self, request):
         """移除默认删除操作"""
         actions = super().get_actions(request)
@@ -48,16 +120,11 @@ class RoomAdmin(admin.ModelAdmin):
             del actions['delete_selected']
         return actions
 
-    def save_model(self, request, obj, form, change):
-        obj.full_clean()
-        super().save_model(request, obj, form, change)
-
     def delete_model(self, request, obj):
         """单个删除时检查活跃订单"""
-        from reservations.models import Reservation
-        active = Reservation.objects.filter(room=obj, status__in=['Booked', 'CheckedIn'])
-        if active.exists():
-            messages.error(request, f'无法删除房间「{obj.room_number}」，存在{active.count()}个活跃订单！')
+        active = active_reservation_count(obj)
+        if active:
+            messages.error(request, f'无法删除房间「{obj.room_number}」，存在{active}个活跃订单！')
             return
         super().delete_model(request, obj)
         messages.success(request, f'房间 {obj.room_number} 已删除')
@@ -65,53 +132,59 @@ class RoomAdmin(admin.ModelAdmin):
     @admin.action(description='删除所选的房间')
     def safe_delete_selected(self, request, queryset):
         """批量安全删除，检查活跃订单"""
-        from reservations.models import Reservation
-        blocked = [
-            r.room_number for r in queryset
-            if Reservation.objects.filter(room=r, status__in=['Booked', 'CheckedIn']).exists()
-        ]
+        # 一次查询找出存在活跃订单的房间：EXISTS 子查询对每个房间命中一条即返回
+        blocked = list(queryset.filter(Exists(active_reservations())).order_by('room_number').values_list(
+            'room_number', flat=True
+        ))
         if blocked:
             messages.error(request, f'操作已取消！以下房间存在活跃订单：{", ".join(blocked)}')
             return
-        count = queryset.count()
-        for r in queryset:
-            r.delete()
+        # 一次批量删除，删除数量取自 delete() 的返回值，不再单独 COUNT
+        _, per_model = queryset.delete()
+        count = per_model.get(Room._meta.label, 0)
         messages.success(request, f'已成功删除 {count} 个房间')
 
     def price_display(self, obj):
         """绿色价格显示"""
-        return format_html('<span style="color:#28a745;font-weight:bold;font-size:14px;">￥{}</span>', obj.price)
+        return mark_safe(PRICE_TPL.format(escape(obj.price)))
     price_display.short_description = '价格(元/晚)'
     price_display.admin_order_field = 'price'
 
     def status_colored(self, obj):
         """彩色状态标签"""
-        colors = {
-            'Available': '#28a745',
-            'Booked': '#ffc107',
-            'Occupied': '#dc3545',
-            'Maintenance': '#6c757d'
-        }
-        return format_html(
-            '<span style="background:{};color:white;padding:3px 10px;border-radius:3px;font-weight:bold;">{}</span>',
-            colors.get(obj.status, '#000'),
-            dict(obj.ROOM_STATUS).get(obj.status, obj.status)
-        )
+        return mark_safe(ROOM_STATUS_TPL.format(
+            ROOM_STATUS_COLORS.get(obj.status, '#000'),
+            escape(Room.ROOM_STATUS_MAP.get(obj.status, obj.status))
+        ))
     status_colored.short_description = '状态'
 
+    @staticmethod
+    def _truncate(text):
+        # 多取一个字符，用于判断是否需要省略号
+        if len(text) > LIST_TEXT_LENGTH:
+            return text[:LIST_TEXT_LENGTH] + '…'
+        return text
+
+    def facilities_short(self, obj):
+        """设施（截断显示）"""
+        return self._truncate(obj.facilities_head)
+    facilities_short.short_description = '设施'
+
+    def description_short(self, obj):
+        """描述（截断显示）"""
+        return self._truncate(obj.description_head)
+    description_short.short_description = '描述'
+
     def picture_image(self, obj):
         """图片预览"""
         if obj.pictures:
-            return format_html(
-                '<a href="{0}" data-lightbox="room-{1}"><img src="{0}" width="100" height="100"/></a>',
-                obj.pictures.url,
-                obj.id
-            )
+            return mark_safe(PICTURE_TPL.format(escape(obj.pictures.url), obj.id))
         return None
     picture_image.short_description = '主图'
 
-    class Media:
-        js = ('https://cdn.jsdelivr.net/npm/lightbox2@2.11.3/dist/js/lightbox.min.js',)
-        css = {
-            'all': ('https://cdn.jsdelivr.net/npm/lightbox2@2.11.3/dist/css/lightbox.min.css',)
-        }
+    def changelist_view(self, request, extra_context=None):
+        """只有列表页显示图片预览，lightbox资源只在列表页加载"""
+        response = super().changelist_view(request, extra_context)
+        if getattr(response, 'context_data', None) and 'media' in response.context_data:
+            response.context_data['media'] += LIGHTBOX_MEDIA
+        return response
@@ -24,6 +24,9 @@ class Room(models.Model):
         ('Occupied', '已入住'),
         ('Maintenance', '维修中')
     )
+    # 代码 → 中文名称，供列表页等频繁查找使用
+    ROOM_TYPES_MAP = dict(ROOM_TYPES)
+    ROOM_STATUS_MAP = dict(ROOM_STATUS)
 
     room_number = models.CharField(max_length=3, unique=True, verbose_name='房间号', validators=[room_number_validator])
     room_type = models.CharField(max_length=50, choices=ROOM_TYPES, verbose_name='房间类型')